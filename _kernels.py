@@ -0,0 +1,76 @@
+"""
+Compiled kernels for the battery report hot paths.
+
+Numba is an optional dependency. When it is not installed the kernels below are
+set to None and battery_report.py falls back to its NumPy implementations.
+battery_report.py imports this module on first use, so Numba is only loaded
+when a kernel is needed.
+Kernels release the GIL so reports can be generated from worker threads.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - exercised only without numba
+    njit = None
+
+
+if njit is not None:
+    @njit(cache=True, nogil=True)
+    def cycle_stats(soc: np.ndarray) -> Tuple[float, int]:
+        """
+        Computes the total absolute SoC delta and deep cycle count in one pass.
+
+        Args:
+            soc (np.ndarray): A contiguous float64 array of SoC readings.
+
+        Returns:
+            Tuple[float, int]: The total absolute SoC delta and the deep cycle count.
+        """
+        total = 0.0
+        deep = 0
+        prev = soc[0]
+        for i in range(1, soc.shape[0]):
+            cur = soc[i]
+            d = cur - prev
+            total += d if d >= 0 else -d
+            if prev >= 90 and cur <= 20:
+                deep += 1
+            prev = cur
+        return total, deep
+
+    @njit("UniTuple(float64, 4)(float64[::1], float64[::1])", cache=True, boundscheck=False, nogil=True)
+    def cell_reduce(voltages: np.ndarray, temps: np.ndarray) -> Tuple[float, float, float, float]:
+        """
+        Computes the voltage sum, min and max and the max temperature in one pass.
+
+        Compiled eagerly for contiguous float64 arrays, the layout produced by
+        parse_cells, so pack-sized inputs skip Numba's type dispatch.
+
+        Args:
+            voltages (np.ndarray): A non-empty contiguous array of cell voltages.
+            temps (np.ndarray): A contiguous array of cell temperatures of the same length.
+
+        Returns:
+            Tuple[float, float, float, float]: The voltage sum, min voltage, max voltage and max temperature.
+        """
+        sum_v = float(voltages[0])
+        min_v = voltages[0]
+        max_v = voltages[0]
+        max_t = temps[0]
+        for i in range(1, voltages.shape[0]):
+            v = voltages[i]
+            sum_v += v
+            if v < min_v:
+                min_v = v
+            if v > max_v:
+                max_v = v
+            if temps[i] > max_t:
+                max_t = temps[i]
+        return sum_v, float(min_v), float(max_v), float(max_t)
+else:  # pragma: no cover - exercised only without numba
+    cycle_stats = None
+    cell_reduce = None
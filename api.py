@@ -1,31 +1,41 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+import asyncio
 
-from battery_report import generate_report
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.openapi.utils import get_openapi
+from fastapi.responses import ORJSONResponse
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import msgspec
+import numpy as np
+import orjson
+import xxhash
+from cachetools import TTLCache
+
+from battery_report import generate_report, generate_reports, parse_cells
 
 app = FastAPI(
     title="EV Battery Report API",
     description="An API for generating battery health reports from EV diagnostic logs.",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
-class Cell(BaseModel):
+class Cell(msgspec.Struct):
     id: int
     voltage: float
     temp_c: float
 
-class SocReading(BaseModel):
+class SocReading(msgspec.Struct):
     ts: str
     soc: int
 
-class CycleHistory(BaseModel):
+class CycleHistory(msgspec.Struct):
     start_soc: int
     end_soc: int
     energy_kwh: float
     duration_h: float
 
-class BatteryLog(BaseModel):
+class BatteryLog(msgspec.Struct, kw_only=True):
     vehicle_id: str
     timestamp: str
     nominal_capacity_kwh: float
@@ -36,17 +46,105 @@ class BatteryLog(BaseModel):
     soc_timeseries: List[SocReading]
     cycle_history: List[CycleHistory]
 
-@app.post("/v1/battery_report", response_model=Dict[str, Any])
-async def create_battery_report(log: BatteryLog):
+# The request body is decoded by msgspec rather than FastAPI, so its schema is
+# published to the OpenAPI document by hand.
+(_BATTERY_LOG_SCHEMA, _BATTERY_LOG_BATCH_SCHEMA), _SCHEMA_COMPONENTS = msgspec.json.schema_components(
+    [BatteryLog, List[BatteryLog]], ref_template="#/components/schemas/{name}"
+)
+# strict=False keeps the lax coercion the former Pydantic models applied,
+# e.g. "soc": 95.0 or numeric strings such as "3.7".
+_battery_log_decoder = msgspec.json.Decoder(BatteryLog, strict=False)
+_battery_log_batch_decoder = msgspec.json.Decoder(List[BatteryLog], strict=False)
+
+# Reports are a pure function of the request body, so retried requests are
+# served from these caches. Entries are keyed by a 128-bit hash of the raw body
+# and hold (body, encoded report); a hit is only served if the bodies match, so
+# a hash collision can never return another vehicle's report. Batch responses
+# can be arbitrarily large, so their cache is bounded by total size (64 MiB)
+# rather than entry count.
+def _entry_size(entry: Tuple[bytes, bytes]) -> int:
+    return len(entry[0]) + len(entry[1])
+
+_report_cache: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+_batch_report_cache: TTLCache = TTLCache(maxsize=64 * 1024 * 1024, ttl=300, getsizeof=_entry_size)
+
+def _openapi() -> Dict[str, Any]:
+    if app.openapi_schema is None:
+        schema = get_openapi(title=app.title, version=app.version, description=app.description, routes=app.routes)
+        schema.setdefault("components", {}).setdefault("schemas", {}).update(_SCHEMA_COMPONENTS)
+        app.openapi_schema = schema
+    return app.openapi_schema
+
+app.openapi = _openapi
+
+def _to_payload(log: BatteryLog) -> Dict[str, Any]:
     """
-    Accepts raw EV diagnostic data in JSON format and returns a battery health report.
+    Converts a decoded log into the input layout expected by battery_report.
+    """
+    payload = msgspec.structs.asdict(log)
+    payload['cells'] = parse_cells(msgspec.to_builtins(log.cells))
+    payload['cycle_history'] = msgspec.to_builtins(log.cycle_history)
+    # Only the SoC values are used, so skip converting the per-reading structs
+    payload['soc_timeseries'] = np.fromiter(
+        (r.soc for r in log.soc_timeseries), dtype=np.float64, count=len(log.soc_timeseries))
+    return payload
+
+def _build_report(log: BatteryLog) -> Dict[str, Any]:
+    return generate_report(_to_payload(log))
+
+def _build_reports(logs: List[BatteryLog]) -> List[Dict[str, Any]]:
+    return generate_reports([_to_payload(log) for log in logs])
+
+async def _cached_response(request: Request, decoder: msgspec.json.Decoder, build: Callable[[Any], Any],
+                           cache: TTLCache) -> Response:
     """
+    Decodes the request body and builds its response, serving repeated bodies from the cache.
+    The build step runs in a worker thread so CPU-bound work does not block the event loop.
+    Reports are encoded once with orjson and returned as a raw Response, which skips
+    FastAPI's response_model validation; response_model is kept for the OpenAPI docs.
+    """
+    body = await request.body()
+    key = xxhash.xxh3_128_intdigest(body)
+    entry = cache.get(key)
+    if entry is not None and entry[0] == body:
+        return Response(entry[1], media_type="application/json")
+
+    try:
+        decoded = decoder.decode(body)
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
     try:
-        report = generate_report(log.dict())
-        return report
+        content = orjson.dumps(await asyncio.to_thread(build, decoded))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    entry = (body, content)
+    if cache.getsizeof(entry) <= cache.maxsize:
+        cache[key] = entry
+    return Response(content, media_type="application/json")
+
+@app.post(
+    "/v1/battery_report",
+    response_model=Dict[str, Any],
+    openapi_extra={"requestBody": {"required": True, "content": {"application/json": {"schema": _BATTERY_LOG_SCHEMA}}}},
+)
+async def create_battery_report(request: Request):
+    """
+    Accepts raw EV diagnostic data in JSON format and returns a battery health report.
+    """
+    return await _cached_response(request, _battery_log_decoder, _build_report, _report_cache)
+
+@app.post(
+    "/v1/battery_report:batch",
+    response_model=List[Dict[str, Any]],
+    openapi_extra={"requestBody": {"required": True, "content": {"application/json": {"schema": _BATTERY_LOG_BATCH_SCHEMA}}}},
+)
+async def create_battery_reports(request: Request):
+    """
+    Accepts a JSON array of EV diagnostic logs and returns one battery health report per log, in order.
+    """
+    return await _cached_response(request, _battery_log_batch_decoder, _build_reports, _batch_report_cache)
 
 # To run this API:
-# 1. Install dependencies: pip install fastapi uvicorn pydantic
+# 1. Install dependencies: pip install fastapi uvicorn msgspec orjson
 # 2. Run the server: uvicorn api:app --reload
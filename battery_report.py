@@ -12,129 +12,412 @@ Example:
     python battery_report.py sample_log.json
 """
 
-import json
 import logging
-from typing import List, Dict, Any, Optional
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple, Union
 from datetime import datetime
 import argparse
 
+import numpy as np
+import orjson
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def compute_soh(raw: dict) -> dict:
+_utcnow = datetime.utcnow
+
+
+@lru_cache(maxsize=None)
+def _get_kernels() -> Any:
+    """
+    Imports the optional Numba kernels on first use, so importing this module
+    does not pay for importing Numba and compiling the kernels.
+
+    Returns:
+        Any: The _kernels module; its kernels are None when Numba is not installed.
+    """
+    import _kernels
+    return _kernels
+
+
+# Anomaly thresholds (inclusive lower bounds) and the severity for each band
+_VOLTAGE_SPREAD_THR = (0.05, 0.10)
+_VOLTAGE_SPREAD_SEV = (None, "minor", "major")
+_TEMP_THR = (45, 60)
+_TEMP_SEV = (None, "warning", "critical")
+
+# Readings stay float64: quantizing cells to float32 shifts voltage spreads
+# across the anomaly thresholds (3.75f - 3.65f < 0.10), and SoC is neither
+# bounded nor necessarily integral, so any narrower type would truncate it.
+_CELL_DTYPE = np.float64
+_SOC_DTYPE = np.float64
+
+
+def _cell_arrays(cells: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Loads per-cell voltages and temperatures into contiguous NumPy arrays.
+
+    Args:
+        cells (List[Dict[str, Any]]): The list of cell readings.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The voltage and temperature arrays.
+    """
+    n = len(cells)
+    voltages = np.fromiter((c['voltage'] for c in cells), dtype=_CELL_DTYPE, count=n)
+    temps = np.fromiter((c['temp_c'] for c in cells), dtype=_CELL_DTYPE, count=n)
+    return voltages, temps
+
+
+def parse_cells(raw_cells: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Converts a list of cell readings into a Structure-of-Arrays layout.
+
+    The result can be stored in place of raw['cells']; all cell reductions in
+    this module accept either layout.
+
+    Args:
+        raw_cells (List[Dict[str, Any]]): The list of cell readings.
+
+    Returns:
+        Dict[str, np.ndarray]: Contiguous "id", "voltage" and "temp_c" arrays.
+    """
+    voltages, temps = _cell_arrays(raw_cells)
+    ids = np.fromiter((c['id'] for c in raw_cells), dtype=np.int32, count=len(raw_cells))
+    return {"id": ids, "voltage": voltages, "temp_c": temps}
+
+
+class CellStats(NamedTuple):
+    """Per-pack cell aggregates shared by the SOH and anomaly calculations."""
+    mean_v: float
+    min_v: float
+    max_v: float
+    max_t: float
+    n: int
+
+
+def _cell_columns(cells: Any) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Returns the voltage and temperature arrays for either cell layout.
+
+    Args:
+        cells (Any): A list of cell readings or the output of parse_cells.
+
+    Returns:
+        Optional[Tuple[np.ndarray, np.ndarray]]: The voltage and temperature
+        arrays, or None if no cells were reported.
+    """
+    if not cells:
+        return None
+    if isinstance(cells, dict):
+        voltages, temps = cells['voltage'], cells['temp_c']
+    else:
+        voltages, temps = _cell_arrays(cells)
+    if voltages.shape[0] == 0:
+        return None
+    return voltages, temps
+
+
+def _cell_stats(cells: Any) -> Optional[CellStats]:
+    """
+    Reduces the cell readings to the aggregates used across the report.
+
+    Args:
+        cells (Any): A list of cell readings or the output of parse_cells.
+
+    Returns:
+        Optional[CellStats]: The mean/min/max voltage, max temperature and cell
+        count, or None if no cells were reported.
+    """
+    columns = _cell_columns(cells)
+    if columns is None:
+        return None
+    voltages, temps = columns
+    n = voltages.shape[0]
+    kernels = _get_kernels()
+    if kernels.cell_reduce is not None:
+        sum_v, min_v, max_v, max_t = kernels.cell_reduce(
+            np.ascontiguousarray(voltages, dtype=_CELL_DTYPE), np.ascontiguousarray(temps, dtype=_CELL_DTYPE))
+    else:
+        # cumsum adds in order, matching the kernel and Python's sum(); sum() is pairwise
+        sum_v = np.cumsum(voltages)[-1]
+        min_v, max_v, max_t = voltages.min(), voltages.max(), temps.max()
+    return CellStats(
+        mean_v=float(sum_v / n),
+        min_v=float(min_v),
+        max_v=float(max_v),
+        max_t=float(max_t),
+        n=n,
+    )
+
+
+def _batch_cell_stats(cells_list: List[Any]) -> List[Optional[CellStats]]:
+    """
+    Computes CellStats for many packs at once.
+
+    The cell arrays are stacked into NaN-padded 2D arrays and reduced along
+    axis 1, so the per-pack reductions run as a handful of NumPy calls.
+    Voltages are summed in order with cumsum so each mean matches _cell_stats
+    exactly.
+
+    Args:
+        cells_list (List[Any]): The cells of each log, in either layout.
+
+    Returns:
+        List[Optional[CellStats]]: The aggregates for each log, or None where no cells were reported.
+    """
+    columns = [_cell_columns(cells) for cells in cells_list]
+    present = [i for i, col in enumerate(columns) if col is not None]
+    stats: List[Optional[CellStats]] = [None] * len(columns)
+    if not present:
+        return stats
+
+    counts = np.array([columns[i][0].shape[0] for i in present])
+    voltages = np.full((len(present), counts.max()), np.nan, dtype=_CELL_DTYPE)
+    temps = np.full_like(voltages, np.nan)
+    for row, i in enumerate(present):
+        voltages[row, :counts[row]], temps[row, :counts[row]] = columns[i]
+
+    # Zero-filled padding sits after each row's cells, so it leaves the in-order sum unchanged
+    sum_v = np.cumsum(np.nan_to_num(voltages, nan=0.0), axis=1)[:, -1]
+    min_v = np.nanmin(voltages, axis=1)
+    max_v = np.nanmax(voltages, axis=1)
+    max_t = np.nanmax(temps, axis=1)
+    for row, i in enumerate(present):
+        n = int(counts[row])
+        stats[i] = CellStats(
+            mean_v=float(sum_v[row] / n),
+            min_v=float(min_v[row]),
+            max_v=float(max_v[row]),
+            max_t=float(max_t[row]),
+            n=n,
+        )
+    return stats
+
+
+def compute_soh(raw: dict, stats: Optional[CellStats] = None) -> dict:
     """
     Computes the battery's State of Health (SOH) using one of three methods.
 
     Args:
         raw (dict): The raw JSON log data.
+        stats (Optional[CellStats]): Precomputed cell aggregates; derived from raw if omitted.
 
     Returns:
         dict: A dictionary containing the SOH percentage, method, and confidence level.
     """
-    if 'measured_capacity_kwh' in raw and 'nominal_capacity_kwh' in raw:
-        soh_percent = (raw['measured_capacity_kwh'] / raw['nominal_capacity_kwh']) * 100
+    measured = raw.get('measured_capacity_kwh')
+    nominal = raw.get('nominal_capacity_kwh')
+    if measured is not None and nominal:
+        soh_percent = (measured / nominal) * 100
         return {"soh_percent": round(soh_percent, 2), "method": "measured_capacity", "confidence": "high"}
     
-    if 'cycle_history' in raw and raw['cycle_history']:
-        total_energy = sum(c['energy_kwh'] for c in raw['cycle_history'])
-        avg_energy = total_energy / len(raw['cycle_history'])
-        soh_percent = (avg_energy / raw['nominal_capacity_kwh']) * 100
+    cycle_history = raw.get('cycle_history')
+    if cycle_history:
+        total_energy = sum(c['energy_kwh'] for c in cycle_history)
+        avg_energy = total_energy / len(cycle_history)
+        soh_percent = (avg_energy / nominal) * 100
         return {"soh_percent": round(soh_percent, 2), "method": "cycle_history_estimate", "confidence": "medium"}
 
     # Fallback to voltage heuristic
-    if 'cells' in raw and raw['cells']:
-        avg_voltage = sum(c['voltage'] for c in raw['cells']) / len(raw['cells'])
-        soh_percent = 30 + (avg_voltage - 3.2) / (4.2 - 3.2) * 70
+    if stats is None:
+        stats = _cell_stats(raw.get('cells'))
+    if stats is not None:
+        soh_percent = 30 + (stats.mean_v - 3.2) / (4.2 - 3.2) * 70
         return {"soh_percent": round(soh_percent, 2), "method": "voltage_heuristic", "confidence": "low"}
 
     return {"soh_percent": 0, "method": "unknown", "confidence": "none"}
 
 
-def count_cycles_from_soc(soc_series: List[Dict[str, Any]]) -> Dict[str, Any]:
+def _soc_array(soc_series: Union[List[Dict[str, Any]], np.ndarray]) -> np.ndarray:
+    """
+    Loads an SoC series into a contiguous float64 array.
+
+    Args:
+        soc_series (Union[List[Dict[str, Any]], np.ndarray]): A list of SoC readings or an array of SoC values.
+
+    Returns:
+        np.ndarray: The SoC values.
+    """
+    if isinstance(soc_series, np.ndarray):
+        return np.ascontiguousarray(soc_series, dtype=_SOC_DTYPE)
+    return np.fromiter((r['soc'] for r in soc_series), dtype=_SOC_DTYPE, count=len(soc_series))
+
+
+def _cycles_result(total_delta_soc: float, deep_cycles: int) -> Dict[str, Any]:
+    """
+    Builds the cycles section of the report from the raw counts.
+
+    Args:
+        total_delta_soc (float): The summed absolute SoC change in percent.
+        deep_cycles (int): The number of deep discharge cycles.
+
+    Returns:
+        Dict[str, Any]: A dictionary with the counts of equivalent and deep cycles.
+    """
+    return {"equivalent_full_cycles": round(total_delta_soc / 100, 2), "deep_cycles": deep_cycles}
+
+
+def count_cycles_from_soc(soc_series: Union[List[Dict[str, Any]], np.ndarray]) -> Dict[str, Any]:
     """
     Counts equivalent full cycles and deep discharge cycles from an SoC time-series.
 
     Args:
-        soc_series (List[Dict[str, Any]]): A list of SoC readings with timestamps.
+        soc_series (Union[List[Dict[str, Any]], np.ndarray]): A list of SoC readings
+            with timestamps, or an array holding just the SoC values.
 
     Returns:
         Dict[str, Any]: A dictionary with the counts of equivalent and deep cycles.
     """
-    if not soc_series or len(soc_series) < 2:
+    if soc_series is None or len(soc_series) < 2:
         return {"equivalent_full_cycles": 0, "deep_cycles": 0}
 
-    total_delta_soc = sum(abs(soc_series[i]['soc'] - soc_series[i-1]['soc']) for i in range(1, len(soc_series)))
-    equivalent_full_cycles = total_delta_soc / 100
+    soc = _soc_array(soc_series)
+    kernels = _get_kernels()
+    if kernels.cycle_stats is not None:
+        total_delta_soc, deep_cycles = kernels.cycle_stats(soc)
+        total_delta_soc, deep_cycles = float(total_delta_soc), int(deep_cycles)
+    else:
+        # cumsum adds in order, matching the kernel and Python's sum(); sum() is pairwise
+        total_delta_soc = float(np.cumsum(np.abs(np.diff(soc)))[-1])
+        deep_cycles = int(np.count_nonzero((soc[:-1] >= 90) & (soc[1:] <= 20)))
+    return _cycles_result(total_delta_soc, deep_cycles)
 
-    deep_cycles = 0
-    for i in range(1, len(soc_series)):
-        if soc_series[i-1]['soc'] >= 90 and soc_series[i]['soc'] <= 20:
-            deep_cycles += 1
-            
-    return {"equivalent_full_cycles": round(equivalent_full_cycles, 2), "deep_cycles": deep_cycles}
+
+def _batch_cycle_counts(soc_list: List[Union[List[Dict[str, Any]], np.ndarray]]) -> List[Dict[str, Any]]:
+    """
+    Counts cycles for many SoC series at once.
+
+    The series are stacked into a NaN-padded 2D array and the per-pair deltas
+    and deep-cycle flags are reduced along axis 1. Deltas are summed in order
+    with cumsum so the totals match count_cycles_from_soc exactly.
+
+    Args:
+        soc_list (List[Union[List[Dict[str, Any]], np.ndarray]]): The SoC series of each log.
+
+    Returns:
+        List[Dict[str, Any]]: The cycle counts for each log.
+    """
+    results = [{"equivalent_full_cycles": 0, "deep_cycles": 0} for _ in soc_list]
+    present = [i for i, series in enumerate(soc_list) if series is not None and len(series) >= 2]
+    if not present:
+        return results
+
+    lengths = [len(soc_list[i]) for i in present]
+    soc = np.full((len(present), max(lengths)), np.nan, dtype=_SOC_DTYPE)
+    for row, i in enumerate(present):
+        soc[row, :lengths[row]] = _soc_array(soc_list[i])
+
+    # Pairs reaching into the padding are NaN; they add zero and never count as deep
+    deltas = np.nan_to_num(np.abs(np.diff(soc, axis=1)), nan=0.0)
+    deep = (soc[:, :-1] >= 90) & (soc[:, 1:] <= 20)
+
+    totals = np.cumsum(deltas, axis=1)[:, -1]
+    deep_counts = np.count_nonzero(deep, axis=1)
+    for row, i in enumerate(present):
+        results[i] = _cycles_result(float(totals[row]), int(deep_counts[row]))
+    return results
 
 
-def detect_anomalies(raw: dict) -> List[Dict[str, Any]]:
+def detect_anomalies(raw: dict, stats: Optional[CellStats] = None) -> List[Dict[str, Any]]:
     """
     Detects anomalies such as voltage imbalance and overheating.
 
     Args:
         raw (dict): The raw JSON log data.
+        stats (Optional[CellStats]): Precomputed cell aggregates; derived from raw if omitted.
 
     Returns:
         List[Dict[str, Any]]: A list of detected anomalies.
     """
     anomalies = []
-    if 'cells' in raw and raw['cells']:
-        voltages = [c['voltage'] for c in raw['cells']]
-        temps = [c['temp_c'] for c in raw['cells']]
-        
-        voltage_spread = max(voltages) - min(voltages)
-        if voltage_spread >= 0.10:
-            anomalies.append({"type": "voltage_imbalance", "severity": "major", "value": round(voltage_spread, 3)})
-        elif voltage_spread >= 0.05:
-            anomalies.append({"type": "voltage_imbalance", "severity": "minor", "value": round(voltage_spread, 3)})
-
-        if max(temps) >= 60:
-            anomalies.append({"type": "overheating", "severity": "critical", "value": max(temps)})
-        elif max(temps) >= 45:
-            anomalies.append({"type": "overheating", "severity": "warning", "value": max(temps)})
-
-    if 'pack_voltage' in raw and 'cell_count' in raw and raw['cell_count'] > 0:
-        implied_cell_v = raw['pack_voltage'] / raw['cell_count']
+    if stats is None:
+        stats = _cell_stats(raw.get('cells'))
+    if stats is not None:
+        voltage_spread = stats.max_v - stats.min_v
+        max_temp = stats.max_t
+        severity = _VOLTAGE_SPREAD_SEV[bisect_right(_VOLTAGE_SPREAD_THR, voltage_spread)]
+        if severity:
+            anomalies.append({"type": "voltage_imbalance", "severity": severity, "value": round(voltage_spread, 3)})
+
+        severity = _TEMP_SEV[bisect_right(_TEMP_THR, max_temp)]
+        if severity:
+            anomalies.append({"type": "overheating", "severity": severity, "value": max_temp})
+
+    pack_voltage = raw.get('pack_voltage')
+    cell_count = raw.get('cell_count')
+    if pack_voltage is not None and cell_count is not None and cell_count > 0:
+        implied_cell_v = pack_voltage / cell_count
         if not (2.5 <= implied_cell_v <= 4.5):
             anomalies.append({"type": "pack_voltage_mismatch", "severity": "warning", "value": round(implied_cell_v, 2)})
             
     return anomalies
 
 
-def generate_report(raw: dict) -> dict:
+def _assemble_report(raw: dict, stats: Optional[CellStats], cycles: Dict[str, Any]) -> dict:
     """
-    Generates the full battery health report.
+    Builds the report for one log from its precomputed cell aggregates and cycle counts.
 
     Args:
         raw (dict): The raw JSON log data.
+        stats (Optional[CellStats]): The log's cell aggregates.
+        cycles (Dict[str, Any]): The log's cycle counts.
 
     Returns:
         dict: The complete battery health report.
     """
-    soh = compute_soh(raw)
-    cycles = count_cycles_from_soc(raw.get('soc_timeseries', []))
-    anomalies = detect_anomalies(raw)
+    soh = compute_soh(raw, stats=stats)
+    anomalies = detect_anomalies(raw, stats=stats)
     
-    explanation = f"Battery SOH is {soh['soh_percent']}% (calculated via {soh['method']}). "
-    explanation += f"Total equivalent cycles: {cycles['equivalent_full_cycles']}. "
-    explanation += f"Detected {len(anomalies)} anomalies."
+    explanation = (
+        f"Battery SOH is {soh['soh_percent']}% (calculated via {soh['method']}). "
+        f"Total equivalent cycles: {cycles['equivalent_full_cycles']}. "
+        f"Detected {len(anomalies)} anomalies."
+    )
 
     return {
         "vehicle_id": raw.get("vehicle_id", "Unknown"),
-        "generated_at": datetime.utcnow().isoformat(),
+        "generated_at": _utcnow().isoformat(),
         "soh": soh,
         "cycles": cycles,
         "anomalies": anomalies,
         "explanation": explanation
     }
 
+
+def generate_report(raw: dict) -> dict:
+    """
+    Generates the full battery health report.
+
+    Args:
+        raw (dict): The raw JSON log data.
+
+    Returns:
+        dict: The complete battery health report.
+    """
+    stats = _cell_stats(raw.get('cells'))
+    cycles = count_cycles_from_soc(raw.get('soc_timeseries', []))
+    return _assemble_report(raw, stats, cycles)
+
+
+def generate_reports(raws: List[dict]) -> List[dict]:
+    """
+    Generates battery health reports for a batch of logs.
+
+    Cell and SoC reductions are vectorized across the whole batch; each
+    report is equivalent to calling generate_report on that log.
+
+    Args:
+        raws (List[dict]): The raw JSON log data of each vehicle.
+
+    Returns:
+        List[dict]: The report for each log, in input order.
+    """
+    stats = _batch_cell_stats([raw.get('cells') for raw in raws])
+    cycles = _batch_cycle_counts([raw.get('soc_timeseries', []) for raw in raws])
+    return [_assemble_report(raw, s, c) for raw, s, c in zip(raws, stats, cycles)]
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate a battery health report from EV diagnostic logs.")
     parser.add_argument("filepath", type=str, nargs='?', default="sample_log.json",
@@ -142,8 +425,8 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     try:
-        with open(args.filepath, 'r') as f:
-            log_data = json.load(f)
+        with open(args.filepath, 'rb') as f:
+            log_data = orjson.loads(f.read())
         
         report = generate_report(log_data)
         
@@ -166,14 +449,14 @@ if __name__ == "__main__":
         
         # Write machine-readable report
         output_filepath = "battery_report_output.json"
-        with open(output_filepath, 'w') as f:
-            json.dump(report, f, indent=2)
+        with open(output_filepath, 'wb') as f:
+            f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
         
         logging.info(f"Successfully generated report. Output saved to {output_filepath}")
 
     except FileNotFoundError:
         logging.error(f"Error: The file '{args.filepath}' was not found.")
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         logging.error(f"Error: Could not decode JSON from the file '{args.filepath}'.")
     except Exception as e:
         logging.error(f"An unexpected error occurred: {e}")
@@ -0,0 +1,55 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("fastapi")
+from cachetools import TTLCache
+from fastapi.testclient import TestClient
+
+import api
+
+@pytest.fixture
+def client():
+    api._report_cache.clear()
+    api._batch_report_cache.clear()
+    return TestClient(api.app)
+
+@pytest.fixture
+def sample_log():
+    with open(os.path.join(os.path.dirname(__file__), "..", "sample_log.json")) as f:
+        return json.load(f)
+
+def test_malformed_body_returns_422(client, sample_log):
+    assert client.post("/v1/battery_report", content=b"{").status_code == 422
+    del sample_log["cells"]
+    response = client.post("/v1/battery_report", json=sample_log)
+    assert response.status_code == 422
+    assert "cells" in response.json()["detail"]
+
+def test_repeated_body_served_from_cache(client, sample_log):
+    body = json.dumps(sample_log).encode()
+    first = client.post("/v1/battery_report", content=body)
+    second = client.post("/v1/battery_report", content=body)
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert len(api._report_cache) == 1
+
+def test_batch_keeps_input_order(client, sample_log):
+    logs = [dict(sample_log, vehicle_id=f"VIN-{i}") for i in range(3)]
+    response = client.post("/v1/battery_report:batch", json=logs)
+    assert response.status_code == 200
+    assert [r["vehicle_id"] for r in response.json()] == ["VIN-0", "VIN-1", "VIN-2"]
+
+def test_batch_empty_array(client):
+    response = client.post("/v1/battery_report:batch", json=[])
+    assert response.status_code == 200
+    assert response.json() == []
+
+def test_oversized_batch_response_not_cached(client, sample_log, monkeypatch):
+    small_cache = TTLCache(maxsize=1024, ttl=300, getsizeof=api._entry_size)
+    monkeypatch.setattr(api, "_batch_report_cache", small_cache)
+    response = client.post("/v1/battery_report:batch", json=[sample_log] * 5)
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+    assert len(small_cache) == 0
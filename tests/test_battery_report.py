@@ -1,9 +1,14 @@
+import numpy as np
 import pytest
+
+import battery_report
 from battery_report import (
     compute_soh,
     count_cycles_from_soc,
     detect_anomalies,
-    generate_report
+    generate_report,
+    generate_reports,
+    parse_cells
 )
 
 @pytest.fixture
@@ -69,6 +74,25 @@ def test_soh_from_voltage_heuristic(sample_log_voltage):
     assert soh["method"] == "voltage_heuristic"
     assert soh["confidence"] == "low"
 
+@pytest.fixture
+def random_voltage_logs():
+    rng = np.random.default_rng(0)
+    return [
+        {"vehicle_id": f"VIN-RND-{i}", "cells": [
+            {"id": j, "voltage": float(v), "temp_c": 25} for j, v in enumerate(rng.uniform(3.3, 4.1, 100))
+        ]}
+        for i in range(200)
+    ]
+
+def test_soh_voltage_heuristic_without_numba(monkeypatch, random_voltage_logs):
+    import _kernels
+    monkeypatch.setattr(_kernels, "cell_reduce", None)
+    for log in random_voltage_logs:
+        # Same sequential summation as the original pure-Python implementation
+        avg_voltage = sum(c["voltage"] for c in log["cells"]) / len(log["cells"])
+        assert battery_report._cell_stats(log["cells"]).mean_v == avg_voltage
+        assert compute_soh(log)["soh_percent"] == round(30 + (avg_voltage - 3.2) / (4.2 - 3.2) * 70, 2)
+
 def test_cycle_counting():
     soc_series = [
         {"soc": 95}, {"soc": 18}, # Deep cycle
@@ -78,6 +102,24 @@ def test_cycle_counting():
     assert cycles["equivalent_full_cycles"] == 1.4
     assert cycles["deep_cycles"] == 1
 
+def test_cycle_counting_from_array():
+    cycles = count_cycles_from_soc(np.array([95, 18, 88, 25], dtype=np.int16))
+    assert cycles == count_cycles_from_soc([{"soc": 95}, {"soc": 18}, {"soc": 88}, {"soc": 25}])
+    assert count_cycles_from_soc(np.array([50], dtype=np.int16))["deep_cycles"] == 0
+
+def test_cycle_counting_out_of_range_soc(monkeypatch):
+    import _kernels
+    soc_series = [{"soc": 150}, {"soc": 120}, {"soc": -10}]
+    expected = {"equivalent_full_cycles": 1.6, "deep_cycles": 1}
+    assert count_cycles_from_soc(soc_series) == expected
+    # The NumPy fallback must agree with the Numba kernel
+    monkeypatch.setattr(_kernels, "cycle_stats", None)
+    assert count_cycles_from_soc(soc_series) == expected
+
+def test_cycle_counting_keeps_soc_precision():
+    assert count_cycles_from_soc([{"soc": 50.9}, {"soc": 50.1}])["equivalent_full_cycles"] == 0.01
+    assert count_cycles_from_soc([{"soc": 40000}, {"soc": 0}])["equivalent_full_cycles"] == 400.0
+
 def test_anomaly_detection():
     log = {
         "cells": [
@@ -93,3 +135,36 @@ def test_anomaly_detection():
     assert any(a['type'] == 'voltage_imbalance' and a['severity'] == 'major' for a in anomalies)
     assert any(a['type'] == 'overheating' and a['severity'] == 'critical' for a in anomalies)
     assert any(a['type'] == 'pack_voltage_mismatch' for a in anomalies)
+
+def test_voltage_spread_threshold_edges():
+    # Expected results are those of the original pure-Python implementation
+    def spread_anomalies(v1, v2):
+        log = {"cells": [{"id": 1, "voltage": v1, "temp_c": 25}, {"id": 2, "voltage": v2, "temp_c": 25}]}
+        return [a for a in detect_anomalies(log) if a["type"] == "voltage_imbalance"]
+
+    assert spread_anomalies(3.65, 3.75) == [{"type": "voltage_imbalance", "severity": "major", "value": 0.1}]
+    assert spread_anomalies(3.60, 3.65) == []
+    soa_log = {"cells": parse_cells([{"id": 1, "voltage": 3.65, "temp_c": 25}, {"id": 2, "voltage": 3.75, "temp_c": 25}])}
+    assert detect_anomalies(soa_log)[0]["severity"] == "major"
+
+def test_temperature_threshold_edges():
+    def temp_anomalies(temp):
+        log = {"cells": [{"id": 1, "voltage": 3.7, "temp_c": temp}]}
+        return [a for a in detect_anomalies(log) if a["type"] == "overheating"]
+
+    assert temp_anomalies(44.999) == []
+    assert temp_anomalies(59.999) == [{"type": "overheating", "severity": "warning", "value": 59.999}]
+    assert temp_anomalies(60) == [{"type": "overheating", "severity": "critical", "value": 60.0}]
+
+def test_anomaly_detection_soa_cells(sample_log_measured):
+    soa_log = dict(sample_log_measured, cells=parse_cells(sample_log_measured["cells"]))
+    assert detect_anomalies(soa_log) == detect_anomalies(sample_log_measured)
+
+def test_batch_reports_match_single(sample_log_measured, sample_log_cycle, sample_log_voltage, random_voltage_logs):
+    logs = [sample_log_measured, sample_log_cycle, {"vehicle_id": "EMPTY"}, sample_log_voltage] + random_voltage_logs
+    for batch, raw in zip(generate_reports(logs), logs):
+        single = generate_report(raw)
+        for key in ("soh", "cycles", "anomalies", "explanation"):
+            assert batch[key] == single[key]
+    cells = [log.get("cells") for log in logs]
+    assert battery_report._batch_cell_stats(cells) == [battery_report._cell_stats(c) for c in cells]